@@ -6,8 +6,13 @@ Tkinter interface for the sprite slicing pipeline.
 import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext
 import threading
+import multiprocessing
 import os
+import queue
+import stat
 import sys
+import time
+from collections import Counter
 from pathlib import Path
 
 from batch_auto_slicer import batch_auto_slice, find_sprite_sheets
@@ -17,6 +22,8 @@ from version import VERSION
 
 
 class SlicerGUI:
+    MAX_LOG_LINES = 10000  # Older lines are trimmed from the top in 1000-line chunks
+
     def __init__(self, root):
         self.root = root
         self.root.title(f"ac-sprite-slicer v{VERSION}")
@@ -24,7 +31,12 @@ class SlicerGUI:
         self.root.resizable(True, True)
 
         self.is_running = False
+        self._stat_cache = {}    # path -> (timestamp, stat_result or None)
+        # Lines (or callables to run on the Tk thread) from worker threads,
+        # drained by _drain_log - workers never call into Tk directly
+        self.log_queue = queue.Queue()
         self.create_widgets()
+        self._drain_log()
 
     def create_widgets(self):
         # Main frame with padding
@@ -105,6 +117,18 @@ class SlicerGUI:
             variable=self.preview_var
         ).pack(side=tk.LEFT)
 
+        self.atlas_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            opts_row, text="Atlas output (no per-tile PNGs)",
+            variable=self.atlas_var
+        ).pack(side=tk.LEFT, padx=(15, 0))
+
+        self.force_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            opts_row, text="Re-slice unchanged sheets",
+            variable=self.force_var
+        ).pack(side=tk.LEFT, padx=(15, 0))
+
         # --- Buttons ---
         btn_frame = ttk.Frame(main_frame)
         btn_frame.pack(fill=tk.X, pady=(0, 10))
@@ -141,18 +165,46 @@ class SlicerGUI:
             self.output_var.set(path)
             self.auto_output_var.set(False)
 
+    def _stat_dir(self, path, ttl=0.5):
+        """
+        Stat a directory at most once per ttl seconds (input folders may be on
+        a network share where every stat is a round-trip).
+
+        Returns the os.stat_result, or None if path is not a directory.
+        """
+        now = time.monotonic()
+        cached = self._stat_cache.get(path)
+        if cached and now - cached[0] < ttl:
+            return cached[1]
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is not None and not stat.S_ISDIR(st.st_mode):
+            st = None
+        self._stat_cache[path] = (now, st)
+        return st
+
     def update_sheets_preview(self):
         input_path = self.input_var.get().strip()
-        if not input_path or not os.path.exists(input_path):
+        if not input_path or self._stat_dir(input_path) is None:
             self.sheets_preview_var.set("")
             return
 
-        sheets = find_sprite_sheets(input_path)
+        # Scan off the Tk thread so large sprite libraries don't freeze the UI
+        def scan():
+            sheets = find_sprite_sheets(input_path)
+            self.log_queue.put(lambda: self._show_sheets_preview(input_path, sheets))
+
+        threading.Thread(target=scan, daemon=True).start()
+
+    def _show_sheets_preview(self, input_path, sheets):
+        if self.input_var.get().strip() != input_path:
+            return  # Input changed while scanning
+
         if sheets:
-            types = {}
-            for s in sheets:
-                t = s['type'].upper()
-                types[t] = types.get(t, 0) + 1
+            types = Counter(s['type'].upper() for s in sheets)
             summary = ", ".join(f"{count} {t}" for t, count in types.items())
             self.sheets_preview_var.set(f"Found: {len(sheets)} sheets ({summary})")
         else:
@@ -160,7 +212,7 @@ class SlicerGUI:
 
     def scan_input(self):
         input_path = self.input_var.get().strip()
-        if not input_path or not os.path.exists(input_path):
+        if not input_path or self._stat_dir(input_path) is None:
             self.log("[ERROR] Please select a valid input folder first")
             return
 
@@ -171,20 +223,53 @@ class SlicerGUI:
 
         self.log("=" * 50)
         self.log(f"[SCAN] Found {len(sheets)} sprite sheet(s):")
+        # Sheet paths are built under Path(input_path), so slicing off that
+        # prefix gives the same result as relative_to() without re-parsing
+        prefix_len = len(os.path.join(str(Path(input_path)), ""))
         for s in sheets:
-            rel = s['path'].relative_to(input_path)
+            rel = str(s['path'])[prefix_len:]
             self.log(f"  [{s['type'].upper():5s}] {rel}")
         self.log("=" * 50)
-        self.update_sheets_preview()
+        self._show_sheets_preview(input_path, sheets)
 
     # ---- Log ----
 
     def log(self, message):
         self.log_text.config(state=tk.NORMAL)
         self.log_text.insert(tk.END, message + "\n")
+        line_count = int(self.log_text.index("end-1c").split(".")[0])
+        if line_count > self.MAX_LOG_LINES:
+            excess = line_count - self.MAX_LOG_LINES + 1000
+            self.log_text.delete("1.0", f"{excess}.0")
         self.log_text.see(tk.END)
         self.log_text.config(state=tk.DISABLED)
 
+    def _drain_log(self):
+        """Append all queued pipeline lines in one insert, then re-arm (50 ms)."""
+        lines = []
+        try:
+            while True:
+                try:
+                    item = self.log_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if callable(item):
+                    if lines:
+                        self.log("\n".join(lines))
+                        lines = []
+                    try:
+                        item()
+                    except Exception as e:
+                        lines.append(f"[ERROR] {e}")
+                else:
+                    lines.append(item)
+            if lines:
+                self.log("\n".join(lines))
+        finally:
+            # Always re-arm: a dead after-chain would freeze the log and
+            # never run pipeline_finished (buttons stay disabled)
+            self.root.after(50, self._drain_log)
+
     def clear_log(self):
         self.log_text.config(state=tk.NORMAL)
         self.log_text.delete(1.0, tk.END)
@@ -197,7 +282,7 @@ class SlicerGUI:
         if not input_path:
             self.log("[ERROR] Please select an input folder")
             return
-        if not os.path.exists(input_path):
+        if self._stat_dir(input_path) is None:
             self.log(f"[ERROR] Input folder does not exist: {input_path}")
             return
 
@@ -206,7 +291,16 @@ class SlicerGUI:
             output_path = os.path.join(input_path, "sliced_output")
             self.output_var.set(output_path)
 
-        if not self.step_slice_var.get() and not self.step_categorize_var.get() and not self.step_meshes_var.get():
+        # Read Tk variables here, on the Tk thread, for the worker to use
+        options = {
+            "slice": self.step_slice_var.get(),
+            "categorize": self.step_categorize_var.get(),
+            "meshes": self.step_meshes_var.get(),
+            "preview": self.preview_var.get(),
+            "atlas": self.atlas_var.get(),
+            "force": self.force_var.get(),
+        }
+        if not options["slice"] and not options["categorize"] and not options["meshes"]:
             self.log("[ERROR] Select at least one pipeline step")
             return
 
@@ -216,19 +310,19 @@ class SlicerGUI:
 
         thread = threading.Thread(
             target=self.run_pipeline,
-            args=(input_path, output_path),
+            args=(input_path, output_path, options),
             daemon=True
         )
         thread.start()
 
-    def run_pipeline(self, input_path, output_path):
+    def run_pipeline(self, input_path, output_path, options):
         # Redirect print to log
         class LogRedirector:
             def __init__(self, gui):
                 self.gui = gui
             def write(self, text):
                 if text.strip():
-                    self.gui.root.after(0, lambda t=text.strip(): self.gui.log(t))
+                    self.gui.log_queue.put_nowait(text.strip())
             def flush(self):
                 pass
 
@@ -241,20 +335,21 @@ class SlicerGUI:
             output_dir = Path(output_path)
 
             # Step 1: Slice
-            if self.step_slice_var.get():
-                self.root.after(0, lambda: self.log("=" * 50))
-                self.root.after(0, lambda: self.log("[STEP 1] Batch Auto-Slice"))
-                self.root.after(0, lambda: self.log("=" * 50))
-                batch_auto_slice(input_path, output_path)
+            if options["slice"]:
+                self.log_queue.put("=" * 50)
+                self.log_queue.put("[STEP 1] Batch Auto-Slice")
+                self.log_queue.put("=" * 50)
+                batch_auto_slice(input_path, output_path, atlas=options["atlas"],
+                                 force=options["force"])
 
             # Step 2: Categorize
-            if self.step_categorize_var.get():
-                self.root.after(0, lambda: self.log(""))
-                self.root.after(0, lambda: self.log("=" * 50))
-                self.root.after(0, lambda: self.log("[STEP 2] Tile Categorizer"))
-                self.root.after(0, lambda: self.log("=" * 50))
+            if options["categorize"]:
+                self.log_queue.put("")
+                self.log_queue.put("=" * 50)
+                self.log_queue.put("[STEP 2] Tile Categorizer")
+                self.log_queue.put("=" * 50)
 
-                preview = self.preview_var.get()
+                preview = options["preview"]
                 tiles_dirs = self._find_dirs(output_dir, "tiles_")
                 if tiles_dirs:
                     for td in tiles_dirs:
@@ -263,29 +358,29 @@ class SlicerGUI:
                     print("No tiles directories found to categorize.")
 
             # Step 3: Meshes
-            if self.step_meshes_var.get():
-                self.root.after(0, lambda: self.log(""))
-                self.root.after(0, lambda: self.log("=" * 50))
-                self.root.after(0, lambda: self.log("[STEP 3] UE5 Mesh Generator"))
-                self.root.after(0, lambda: self.log("=" * 50))
+            if options["meshes"]:
+                self.log_queue.put("")
+                self.log_queue.put("=" * 50)
+                self.log_queue.put("[STEP 3] UE5 Mesh Generator")
+                self.log_queue.put("=" * 50)
 
                 self._generate_meshes(output_dir)
 
-            self.root.after(0, lambda: self.log(""))
-            self.root.after(0, lambda: self.log("=" * 50))
-            self.root.after(0, lambda: self.log("[DONE] Pipeline complete!"))
-            self.root.after(0, lambda: self.log(f"Output: {output_dir}"))
-            self.root.after(0, lambda: self.log("=" * 50))
+            self.log_queue.put("")
+            self.log_queue.put("=" * 50)
+            self.log_queue.put("[DONE] Pipeline complete!")
+            self.log_queue.put(f"Output: {output_dir}")
+            self.log_queue.put("=" * 50)
 
         except Exception as e:
-            self.root.after(0, lambda: self.log(f"[ERROR] {e}"))
+            self.log_queue.put(f"[ERROR] {e}")
             import traceback
             tb = traceback.format_exc()
-            self.root.after(0, lambda: self.log(tb))
+            self.log_queue.put(tb)
         finally:
             sys.stdout = old_stdout
             sys.stderr = old_stderr
-            self.root.after(0, self.pipeline_finished)
+            self.log_queue.put(self.pipeline_finished)
 
     def pipeline_finished(self):
         self.is_running = False
@@ -295,12 +390,32 @@ class SlicerGUI:
     def _find_dirs(self, output_dir, prefix):
         """Find subdirectories matching prefix that contain manifest.json."""
         results = []
-        if not output_dir.exists():
+        # Not cached: the output tree is created mid-run by the slice step
+        if not output_dir.is_dir():
             return results
-        for root, dirs, files in os.walk(output_dir):
-            root_p = Path(root)
-            if root_p.name.startswith(prefix) and "manifest.json" in files:
-                results.append(root_p)
+        if output_dir.name.startswith(prefix) and (output_dir / "manifest.json").is_file():
+            results.append(output_dir)
+        # scandir DFS: DirEntry.is_dir() uses the cached d_type, and only
+        # prefix-matching dirs pay a stat for manifest.json. The mesh trees
+        # _generate_meshes writes (meshes_tiles_*, meshes_ships_*) and hidden
+        # dirs never hold sliced output, so they are pruned. A bare "meshes_"
+        # prefix is not enough: a source folder like "Meshes Pack" slices
+        # into meshes_pack/.
+        stack = [str(output_dir)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                        name = entry.name
+                        if name.startswith(("meshes_tiles_", "meshes_ships_", ".")):
+                            continue
+                        if name.startswith(prefix) and os.path.isfile(os.path.join(entry.path, "manifest.json")):
+                            results.append(Path(entry.path))
+                        stack.append(entry.path)
+            except OSError:
+                continue  # Unreadable or vanished dir - os.walk skipped these too
         return sorted(results)
 
     def _generate_meshes(self, output_dir):
@@ -335,4 +450,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for the batch slicer's process pool in the frozen EXE
+    multiprocessing.freeze_support()
     main()
@@ -21,12 +21,20 @@ Requirements:
 """
 
 import os
+import re
 import sys
 import json
+import shutil
 import argparse
+import hashlib
+import multiprocessing
+import struct
+import zlib
 from pathlib import Path
 from PIL import Image
-from collections import defaultdict
+from collections import defaultdict, deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 
 # ============================================================================
@@ -211,89 +219,141 @@ def detect_scale(img_width, base_width):
         return f"{int(scale)}x", int(scale)
 
 
-def is_empty_tile(img, threshold=5):
-    """Check if tile is fully transparent or near-empty."""
-    data = list(img.getdata())
-    visible = sum(1 for p in data if len(p) > 3 and p[3] > 10)
-    return visible < threshold
+# Sprites with fewer visible (alpha > 10) pixels than this are skipped as empty
+MIN_VISIBLE_PIXELS = 5
 
 
-def slice_tuna_image(img_path, scale, output_dir):
+def count_visible(alpha):
+    """Count pixels with alpha > 10 in an "L" alpha plane (C-level histogram)."""
+    return sum(alpha.histogram()[11:])
+
+
+def load_rgba(img_path):
     """
-    Slice imgTuna.png using exact sprite coordinates from manual analysis.
-    Extracts full strips for animated sprites (can be split in-engine).
+    Decode a sprite sheet once as RGBA and release the file handle right away.
     
-    Args:
-        img_path: Path to imgTuna.png
-        scale: Scale multiplier (1, 2, 4, etc.)
-        output_dir: Output directory for sliced sprites
+    Sheets that are already RGBA are returned as decoded; anything else
+    (P, RGB, LA...) goes through a single C-level convert.
+    """
+    with Image.open(img_path) as img:
+        img.load()
+        if img.mode != "RGBA":
+            img = img.convert("RGBA")
+    return img
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_chunk(tag, data):
+    """Length + tag + data + CRC, as laid out in a PNG file."""
+    crc = zlib.crc32(data, zlib.crc32(tag))
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", crc)
+
+
+def save_rgba_png(img, path, compress_level=1, raw=None):
+    """
+    Write an RGBA image as a minimal PNG (IHDR, one IDAT, IEND).
+    
+    Every scanline uses filter type 0 and the whole image goes through one
+    zlib.compress call, skipping Pillow's per-save encoder setup and filter
+    heuristics - about 2x faster on sprite-sized images. Decodes to exactly
+    the pixels Image.save(path, "PNG") would have stored. Pass raw when the
+    caller already holds img.tobytes() (e.g. from hashing) to skip a copy.
+    The file is written to a temp name and os.replace()d into place.
+    """
+    width, height = img.size
+    if raw is None:
+        raw = img.tobytes()
+    stride = width * 4
+    scanlines = b"".join(
+        b"\x00" + raw[i:i + stride] for i in range(0, len(raw), stride)
+    )
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)  # 8-bit RGBA
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(PNG_SIGNATURE
+                + _png_chunk(b"IHDR", ihdr)
+                + _png_chunk(b"IDAT", zlib.compress(scanlines, compress_level))
+                + _png_chunk(b"IEND", b""))
+    os.replace(tmp_path, path)
+
+
+def write_json(path, data, indent=2):
+    """
+    Encode data in one json.dumps call and write it with a single write.
     
-    Returns:
-        Tuple of (saved_count, empty_count)
+    json.dump() streams through iterencode and issues a write per chunk;
+    with indent=None the C encoder is used as well.
+    """
+    with open(path, 'w') as f:
+        f.write(json.dumps(data, indent=indent))
+
+
+def submit_bounded(pool, pending, limit, fn, *args):
     """
-    img = Image.open(img_path)
-    if img.mode != "RGBA":
-        img = img.convert("RGBA")
+    Submit fn(*args) to pool and track its future in the pending deque.
     
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
+    With limit jobs already in flight it first waits on the oldest, so the
+    queued work (and the images it holds) stays bounded.
+    """
+    if len(pending) >= limit:
+        pending.popleft().result()
+    pending.append(pool.submit(fn, *args))
+
+
+def drain(pending):
+    """Wait for every pending future, re-raising the first job error."""
+    for future in pending:
+        future.result()
+
+
+@lru_cache(maxsize=None)
+def tuna_sprite_plan(scale):
+    """
+    Build the imgTuna.png crop list for one scale from TUNA_SPRITES.
     
-    saved = 0
-    empty = 0
-    manifest = {}
+    Cached per scale, so batches with many sheets of the same scale walk
+    the coordinate tables only once. Callers must not mutate the result.
+    
+    Returns:
+        Tuple of (box, name, category, metadata) with box scaled to
+        (left, upper, right, lower) and metadata a dict or None
+    """
+    plan = []
     
     def s(val):
         """Scale a coordinate/size by the scale factor."""
         return int(val * scale)
     
-    def save_sprite(sprite, name, category, metadata=None):
-        """Save a sprite and add to manifest."""
-        nonlocal saved, empty
-        
-        if is_empty_tile(sprite):
-            empty += 1
-            return False
-        
-        sprite_path = output_dir / f"{name}.png"
-        sprite.save(sprite_path, "PNG")
-        
-        entry = {
-            "file": f"{name}.png",
-            "category": category
-        }
-        if metadata:
-            entry.update(metadata)
-        
-        manifest[name] = entry
-        saved += 1
-        return True
+    def add(box, name, category, metadata=None):
+        plan.append((box, name, category, metadata))
     
     # --- TEAM SWITCHING BUTTONS (60x45 each) ---
     btns = TUNA_SPRITES["team_buttons"]
+    w, h = s(btns["width"]), s(btns["height"])
     for team_name, coords in btns["teams"].items():
         x, y = s(coords["x"]), s(coords["y"])
-        w, h = s(btns["width"]), s(btns["height"])
-        sprite = img.crop((x, y, x + w, y + h))
-        save_sprite(sprite, f"button_team_{team_name}", "ui", {"team": team_name})
+        add((x, y, x + w, y + h), f"button_team_{team_name}", "ui", {"team": team_name})
     
     # --- RETICLES (full 248x122 area) ---
     ret = TUNA_SPRITES["reticles"]
     x, y = s(ret["x"]), s(ret["y"])
     w, h = s(ret["width"]), s(ret["height"])
-    sprite = img.crop((x, y, x + w, y + h))
-    save_sprite(sprite, "reticles_full", "ui", {"width": ret["width"], "height": ret["height"]})
+    add((x, y, x + w, y + h), "reticles_full", "ui", {"width": ret["width"], "height": ret["height"]})
     
     # --- SHIPS (9 frames of 32x32 per team) ---
     ships = TUNA_SPRITES["ships"]
     dir_names = ships["dir_names"]
+    frame_w = ships["frame_width"]
+    w, h = s(frame_w), s(ships["height"])
     for team_name, coords in ships["teams"].items():
+        base_x = coords["x"]
+        y = s(coords["y"])
         for dir_idx, dir_name in enumerate(dir_names):
-            x = s(coords["x"] + dir_idx * ships["frame_width"])
-            y = s(coords["y"])
-            w = s(ships["frame_width"])
-            h = s(ships["height"])
-            sprite = img.crop((x, y, x + w, y + h))
-            save_sprite(sprite, f"ship_{team_name}_{dir_idx}_{dir_name}", "ships", {
+            x = s(base_x + dir_idx * frame_w)
+            add((x, y, x + w, y + h), f"ship_{team_name}_{dir_idx}_{dir_name}", "ships", {
                 "team": team_name,
                 "direction": dir_name,
                 "direction_index": dir_idx
@@ -301,38 +361,33 @@ def slice_tuna_image(img_path, scale, output_dir):
     
     # --- FLAGS (13x13 each) ---
     flags = TUNA_SPRITES["flags"]
+    w, h = s(flags["width"]), s(flags["height"])
     for team_name, coords in flags["teams"].items():
         x, y = s(coords["x"]), s(coords["y"])
-        w, h = s(flags["width"]), s(flags["height"])
-        sprite = img.crop((x, y, x + w, y + h))
-        save_sprite(sprite, f"flag_{team_name}", "flags", {"team": team_name})
+        add((x, y, x + w, y + h), f"flag_{team_name}", "flags", {"team": team_name})
     
     # --- GRENADE (76x13, 5 frames → 15x13 per frame) ---
     gren = TUNA_SPRITES["grenade"]
     grenade_frames = 5
     frame_w = gren["width"] // grenade_frames  # 15px
+    base_x = gren["x"]
+    y, w, h = s(gren["y"]), s(frame_w), s(gren["height"])
     for i in range(grenade_frames):
-        x = s(gren["x"] + i * frame_w)
-        y = s(gren["y"])
-        w = s(frame_w)
-        h = s(gren["height"])
-        sprite = img.crop((x, y, x + w, y + h))
-        save_sprite(sprite, f"grenade_frame_{i}", "projectiles", {"frame": i})
+        x = s(base_x + i * frame_w)
+        add((x, y, x + w, y + h), f"grenade_frame_{i}", "projectiles", {"frame": i})
     
     # --- RADAR BOX (25x22) ---
     radar = TUNA_SPRITES["radar_box"]
     x, y = s(radar["x"]), s(radar["y"])
     w, h = s(radar["width"]), s(radar["height"])
-    sprite = img.crop((x, y, x + w, y + h))
-    save_sprite(sprite, "radar_box", "ui")
+    add((x, y, x + w, y + h), "radar_box", "ui")
     
     # --- GRENADE TRAILS (172x19 each - FULL STRIPS) ---
     gtrails = TUNA_SPRITES["trails_grenade"]
+    w, h = s(gtrails["width"]), s(gtrails["height"])
     for team_name, coords in gtrails["teams"].items():
         x, y = s(coords["x"]), s(coords["y"])
-        w, h = s(gtrails["width"]), s(gtrails["height"])
-        sprite = img.crop((x, y, x + w, y + h))
-        save_sprite(sprite, f"trail_grenade_{team_name}", "effects", {
+        add((x, y, x + w, y + h), f"trail_grenade_{team_name}", "effects", {
             "team": team_name,
             "width": gtrails["width"],
             "height": gtrails["height"]
@@ -340,11 +395,10 @@ def slice_tuna_image(img_path, scale, output_dir):
     
     # --- MISSILE TRAILS (87x10 each - FULL STRIPS) ---
     mtrails = TUNA_SPRITES["trails_missile"]
+    w, h = s(mtrails["width"]), s(mtrails["height"])
     for team_name, coords in mtrails["teams"].items():
         x, y = s(coords["x"]), s(coords["y"])
-        w, h = s(mtrails["width"]), s(mtrails["height"])
-        sprite = img.crop((x, y, x + w, y + h))
-        save_sprite(sprite, f"trail_missile_{team_name}", "effects", {
+        add((x, y, x + w, y + h), f"trail_missile_{team_name}", "effects", {
             "team": team_name,
             "width": mtrails["width"],
             "height": mtrails["height"]
@@ -354,8 +408,7 @@ def slice_tuna_image(img_path, scale, output_dir):
     exp_smoke = TUNA_SPRITES["explosion_smoke"]
     x, y = s(exp_smoke["x"]), s(exp_smoke["y"])
     w, h = s(exp_smoke["width"]), s(exp_smoke["height"])
-    sprite = img.crop((x, y, x + w, y + h))
-    save_sprite(sprite, "explosion_smoke", "effects", {
+    add((x, y, x + w, y + h), "explosion_smoke", "effects", {
         "width": exp_smoke["width"],
         "height": exp_smoke["height"]
     })
@@ -364,22 +417,19 @@ def slice_tuna_image(img_path, scale, output_dir):
     tip = TUNA_SPRITES["missile_tip"]
     x, y = s(tip["x"]), s(tip["y"])
     w, h = s(tip["width"]), s(tip["height"])
-    sprite = img.crop((x, y, x + w, y + h))
-    save_sprite(sprite, "missile_tip", "projectiles")
+    add((x, y, x + w, y + h), "missile_tip", "projectiles")
     
     # --- SHRAPNEL (5x5) ---
     shrap = TUNA_SPRITES["shrapnel"]
     x, y = s(shrap["x"]), s(shrap["y"])
     w, h = s(shrap["width"]), s(shrap["height"])
-    sprite = img.crop((x, y, x + w, y + h))
-    save_sprite(sprite, "shrapnel", "projectiles")
+    add((x, y, x + w, y + h), "shrapnel", "projectiles")
     
     # --- GRENADE EXPLOSION SMOKE (395x106 - FULL AREA) ---
     gexp = TUNA_SPRITES["grenade_explosion_smoke"]
     x, y = s(gexp["x"]), s(gexp["y"])
     w, h = s(gexp["width"]), s(gexp["height"])
-    sprite = img.crop((x, y, x + w, y + h))
-    save_sprite(sprite, "grenade_explosion_smoke", "effects", {
+    add((x, y, x + w, y + h), "grenade_explosion_smoke", "effects", {
         "width": gexp["width"],
         "height": gexp["height"]
     })
@@ -388,12 +438,91 @@ def slice_tuna_image(img_path, scale, output_dir):
     ship_exp = TUNA_SPRITES["ship_death_explosion"]
     x, y = s(ship_exp["x"]), s(ship_exp["y"])
     w, h = s(ship_exp["width"]), s(ship_exp["height"])
-    sprite = img.crop((x, y, x + w, y + h))
-    save_sprite(sprite, "ship_death_explosion", "effects", {
+    add((x, y, x + w, y + h), "ship_death_explosion", "effects", {
         "width": ship_exp["width"],
         "height": ship_exp["height"]
     })
     
+    return tuple(plan)
+
+
+def slice_tuna_image(img_path, scale, output_dir, compress_level=1, dedupe=False, workers=None):
+    """
+    Slice imgTuna.png using exact sprite coordinates from manual analysis.
+    Extracts full strips for animated sprites (can be split in-engine).
+    
+    Args:
+        img_path: Path to imgTuna.png
+        scale: Scale multiplier (1, 2, 4, etc.)
+        output_dir: Output directory for sliced sprites
+        compress_level: zlib level for sprite PNGs (0 = store uncompressed)
+        dedupe: Write pixel-identical sprites once; repeats point their
+            manifest "file" at the first copy and get a "dup_of" name
+        workers: Threads for PNG encoding (default: CPU count)
+    
+    Returns:
+        Tuple of (saved_count, empty_count)
+    """
+    img = load_rgba(img_path)
+    
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Per-sprite paths are prefix + name strings, cheaper than a Path join each
+    out_prefix = os.path.join(output_dir, "")
+    
+    # Emptiness is tested on the 1-byte alpha plane; the RGBA crop is only
+    # made for sprites that actually get saved
+    alpha = img.getchannel("A")
+    
+    saved = 0
+    empty = 0
+    manifest = {}
+    to_save = []  # (sprite, path, raw) jobs, encoded on a thread pool at the end
+    seen = {}  # (size, pixel digest) -> first sprite name, when deduping
+    
+    def save_sprite(box, name, category, metadata=None):
+        """Crop the (left, upper, right, lower) box, save it and add to manifest."""
+        nonlocal saved, empty
+        
+        if count_visible(alpha.crop(box)) < MIN_VISIBLE_PIXELS:
+            empty += 1
+            return False
+        
+        sprite = img.crop(box)
+        entry = {
+            "file": f"{name}.png",
+            "category": category
+        }
+        if metadata:
+            entry.update(metadata)
+        
+        first = name
+        raw = None
+        if dedupe:
+            raw = sprite.tobytes()  # Reused by the PNG writer
+            digest = hashlib.blake2b(raw, digest_size=16).digest()
+            first = seen.setdefault((sprite.size, digest), name)
+        if first == name:
+            to_save.append((sprite, f"{out_prefix}{name}.png", raw))
+        else:
+            entry["file"] = f"{first}.png"
+            entry["dup_of"] = first
+        
+        manifest[name] = entry
+        saved += 1
+        return True
+    
+    for box, name, category, metadata in tuna_sprite_plan(scale):
+        save_sprite(box, name, category, metadata)
+    
+    # --- Write sprite PNGs on a thread pool ---
+    def write_sprite(item):
+        sprite, sprite_path, raw = item
+        save_rgba_png(sprite, sprite_path, compress_level, raw)
+    
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        list(pool.map(write_sprite, to_save))  # Re-raise any save error
+    
     # --- Save manifest ---
     categories = {}
     for entry in manifest.values():
@@ -409,22 +538,27 @@ def slice_tuna_image(img_path, scale, output_dir):
         "sprites": manifest
     }
     
-    with open(output_dir / "manifest.json", 'w') as f:
-        json.dump(manifest_data, f, indent=2)
+    write_json(output_dir / "manifest.json", manifest_data)
     
     return saved, empty
 
 
-def slice_image(img_path, tile_size, output_dir, sprite_type="tiles"):
+def slice_image(img_path, tile_size, output_dir, sprite_type="tiles", atlas=False,
+                compress_level=1, dedupe=False, workers=None):
     """
     Slice a single image into tiles.
     
+    With atlas=True no per-tile PNGs are written: the sheet is copied to
+    atlas.png and each manifest entry gets a "rect" [x, y, w, h] into it.
+    compress_level is the zlib level for tile PNGs (0 = store uncompressed).
+    With dedupe=True a tile pixel-identical to an earlier one is not written;
+    its manifest "file" points at the first copy and "dup_of" names it.
+    workers is the PNG encode thread count (default: CPU count).
+    
     Returns:
         Tuple of (saved_count, empty_count)
     """
-    img = Image.open(img_path)
-    if img.mode != "RGBA":
-        img = img.convert("RGBA")
+    img = load_rgba(img_path)
     
     width, height = img.size
     cols = width // tile_size
@@ -432,35 +566,83 @@ def slice_image(img_path, tile_size, output_dir, sprite_type="tiles"):
     
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
+    out_prefix = os.path.join(output_dir, "")
     
     saved = 0
     empty = 0
     manifest = {}
     
-    for row in range(rows):
-        for col in range(cols):
-            x = col * tile_size
+    # Test emptiness on the alpha plane (extracted once) so only tiles that
+    # are actually saved get a full RGBA crop. The probe reuses one tile-sized
+    # buffer; saved tiles still get their own crop since saves run on threads.
+    alpha = img.getchannel("A")
+    alpha_buf = Image.new("L", (tile_size, tile_size))
+    seen = {}  # pixel digest -> first tile name, when deduping
+    
+    # PNG encode + file write are handed to a thread pool so they overlap with
+    # cropping - zlib and file I/O release the GIL (the outer per-sheet loop
+    # already uses processes). In-flight saves are capped so queued tile
+    # copies never add up to a second sheet.
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 4
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        # Column offsets are the same for every row - compute them once
+        col_xs = [(col, col * tile_size) for col in range(cols)]
+        
+        for row in range(rows):
             y = row * tile_size
+            y2 = y + tile_size
+            row_base = row * cols
             
-            tile = img.crop((x, y, x + tile_size, y + tile_size))
+            # Probe the row's tiles from one contiguous alpha band rather than
+            # reaching back into the full-sheet plane for every tile
+            alpha_band = alpha.crop((0, y, width, y2))
             
-            if is_empty_tile(tile):
-                empty += 1
+            # No tile can reach the threshold if the whole band doesn't
+            if count_visible(alpha_band) < MIN_VISIBLE_PIXELS:
+                empty += cols
                 continue
             
-            tile_idx = row * cols + col
-            tile_name = f"{sprite_type}_{tile_idx:04d}"
-            tile_path = output_dir / f"{tile_name}.png"
-            
-            tile.save(tile_path, "PNG")
-            
-            manifest[tile_name] = {
-                "file": f"{tile_name}.png",
-                "row": row,
-                "col": col,
-                "index": tile_idx
-            }
-            saved += 1
+            for col, x in col_xs:
+                box = (x, y, x + tile_size, y2)
+                
+                alpha_buf.paste(alpha_band, (-x, 0))
+                if count_visible(alpha_buf) < MIN_VISIBLE_PIXELS:
+                    empty += 1
+                    continue
+                
+                tile_idx = row_base + col
+                tile_name = f"{sprite_type}_{tile_idx:04d}"
+                
+                manifest[tile_name] = {
+                    "file": f"{tile_name}.png",
+                    "row": row,
+                    "col": col,
+                    "index": tile_idx
+                }
+                saved += 1
+                
+                if atlas:
+                    manifest[tile_name]["rect"] = [x, y, tile_size, tile_size]
+                    continue
+                
+                tile = img.crop(box)
+                raw = None
+                if dedupe:
+                    raw = tile.tobytes()  # Reused by the PNG writer
+                    digest = hashlib.blake2b(raw, digest_size=16).digest()
+                    first = seen.setdefault(digest, tile_name)
+                    if first != tile_name:
+                        manifest[tile_name]["file"] = f"{first}.png"
+                        manifest[tile_name]["dup_of"] = first
+                        continue
+                
+                tile_path = f"{out_prefix}{tile_name}.png"
+                submit_bounded(pool, pending, max_pending,
+                               save_rgba_png, tile, tile_path, compress_level, raw)
+        
+        drain(pending)
     
     # Save manifest
     manifest_data = {
@@ -472,8 +654,11 @@ def slice_image(img_path, tile_size, output_dir, sprite_type="tiles"):
         "tiles": manifest
     }
     
-    with open(output_dir / "manifest.json", 'w') as f:
-        json.dump(manifest_data, f, indent=2)
+    if atlas:
+        shutil.copyfile(img_path, output_dir / "atlas.png")
+        manifest_data["atlas"] = "atlas.png"
+    
+    write_json(output_dir / "manifest.json", manifest_data)
     
     return saved, empty
 
@@ -488,30 +673,71 @@ def find_sprite_sheets(input_folder):
     input_folder = Path(input_folder)
     found = []
     
-    for root, dirs, files in os.walk(input_folder):
-        root_path = Path(root)
+    # scandir DFS in os.walk's (top-down) order: DirEntry.is_dir()/is_file()
+    # use the cached d_type, so only matching names cost anything
+    stack = [str(input_folder)]
+    while stack:
+        root = stack.pop()
+        subdirs = []
+        matches = []
+        try:
+            with os.scandir(root) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    fname_lower = entry.name.lower()
+                    if fname_lower == "imgtiles.png":
+                        matches.append((entry.name, "tiles"))
+                    elif fname_lower == "imgtuna.png":
+                        matches.append((entry.name, "ships"))
+        except OSError:
+            continue  # Unreadable dir - os.walk skipped these too
+        stack.extend(reversed(subdirs))
         
-        for fname in files:
-            fname_lower = fname.lower()
-            
-            if fname_lower == "imgtiles.png":
-                found.append({
-                    "path": root_path / fname,
-                    "type": "tiles",
-                    "folder": root_path.name,
-                    "parent": root_path.parent.name if root_path.parent != input_folder else ""
-                })
-            elif fname_lower == "imgtuna.png":
+        if matches:
+            root_path = Path(root)
+            parent = root_path.parent.name if root_path.parent != input_folder else ""
+            for fname, sheet_type in matches:
                 found.append({
                     "path": root_path / fname,
-                    "type": "ships",
+                    "type": sheet_type,
                     "folder": root_path.name,
-                    "parent": root_path.parent.name if root_path.parent != input_folder else ""
+                    "parent": parent
                 })
     
     return found
 
 
+def prefetch_sheets(sheets):
+    """
+    Ask the OS to start reading all sprite sheets into the page cache.
+    
+    On cold caches the kernel then reads every sheet in the background while
+    the first ones are being decoded. No-op where posix_fadvise is unavailable
+    (Windows, macOS).
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    
+    for sheet in sheets:
+        try:
+            fd = os.open(sheet["path"], os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+_SEPARATOR_RE = re.compile(r"[ -]")
+_NON_WORD_RE = re.compile(r"\W+")
+_UNDERSCORES_RE = re.compile(r"__+")
+
+
 def get_output_folder_name(sheet_info):
     """
     Generate a clean output folder name from the source path.
@@ -526,27 +752,141 @@ def get_output_folder_name(sheet_info):
     else:
         name = sheet_info["folder"]
     
-    # Clean up the name
-    name = name.lower()
-    name = name.replace(" ", "_")
-    name = name.replace("-", "_")
-    name = "".join(c for c in name if c.isalnum() or c == "_")
+    # Clean up the name (\W is exactly "not isalnum() and not _")
+    name = _SEPARATOR_RE.sub("_", name.lower())
+    name = _NON_WORD_RE.sub("", name)
     
     # Remove redundant underscores
-    while "__" in name:
-        name = name.replace("__", "_")
+    name = _UNDERSCORES_RE.sub("_", name)
     
     return name.strip("_")
 
 
-def batch_auto_slice(input_folder, output_folder=None):
+def _slice_one_sheet(sheet, input_folder, output_folder, atlas=False, compress_level=1,
+                     dedupe=False, workers=None):
+    """
+    Detect scale and slice a single sprite sheet.
+    
+    Runs in a worker process, so it returns its log text instead of printing
+    (worker stdout does not reach the GUI log).
+    
+    Returns:
+        Tuple of (result_dict, log_text)
+    """
+    with Image.open(sheet["path"]) as img:
+        width, height = img.size  # Header only - no pixel decode
+    
+    # Detect scale and calculate tile size
+    if sheet["type"] == "tiles":
+        scale_name, scale_mult = detect_scale(width, BASE_TILES["width"])
+        tile_size = (BASE_TILES["width"] // BASE_TILES["grid_cols"]) * scale_mult
+        base_ref = f"{BASE_TILES['grid_cols']} cols"
+    else:  # ships/tuna
+        scale_name, scale_mult = detect_scale(width, BASE_TUNA["width"])
+        tile_size = (BASE_TUNA["width"] // BASE_TUNA["grid_cols"]) * scale_mult
+        base_ref = f"{BASE_TUNA['grid_cols']} cols"
+    
+    # Generate output folder name
+    folder_name = get_output_folder_name(sheet)
+    out_subdir = f"{sheet['type']}_{scale_name}"
+    out_path = output_folder / folder_name / out_subdir
+    
+    # Use different slicing method for imgTuna vs imgTiles
+    if sheet["type"] == "ships":
+        # imgTuna has non-uniform sprite regions - use special slicer
+        saved, empty = slice_tuna_image(
+            sheet["path"],
+            scale_mult,
+            out_path,
+            compress_level=compress_level,
+            dedupe=dedupe,
+            workers=workers
+        )
+    else:
+        # imgTiles is a uniform grid
+        saved, empty = slice_image(
+            sheet["path"],
+            tile_size,
+            out_path,
+            sheet["type"],
+            atlas=atlas,
+            compress_level=compress_level,
+            dedupe=dedupe,
+            workers=workers
+        )
+    
+    log = "\n".join([
+        f"\n{'─' * 70}",
+        f"Processing: {sheet['path'].name}",
+        f"  Source:     {sheet['path'].relative_to(input_folder)}",
+        f"  Dimensions: {width}x{height}",
+        f"  Detected:   {scale_name} scale ({base_ref} → {tile_size}x{tile_size}px)",
+        f"  Output:     {out_path.relative_to(output_folder)}",
+        f"  Result:     {saved} saved, {empty} empty",
+    ])
+    
+    result = {
+        "source": str(sheet["path"].relative_to(input_folder)),
+        "output": str(out_path.relative_to(output_folder)),
+        "scale": scale_name,
+        "tile_size": tile_size,
+        "saved": saved,
+        "empty": empty
+    }
+    return result, log
+
+
+SCAN_CACHE_NAME = ".scan_cache.json"
+
+
+def load_scan_cache(output_folder):
+    """Load {sheet_path: {"stamp": [...], "result": {...}}} from a previous run."""
+    try:
+        with open(Path(output_folder) / SCAN_CACHE_NAME) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_scan_cache(output_folder, cache):
+    """Atomically rewrite the scan cache (write to a temp file, then rename)."""
+    output_folder = Path(output_folder)
+    output_folder.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_folder / (SCAN_CACHE_NAME + ".tmp")
+    write_json(tmp_path, cache, indent=None)  # Machine-read only - keep it compact
+    os.replace(tmp_path, output_folder / SCAN_CACHE_NAME)
+
+
+def batch_auto_slice(input_folder, output_folder=None, jobs=None, atlas=False,
+                     fast_intermediate=False, force=False, png_level=None, dedupe=False):
     """
     Main batch processing function.
     
+    With jobs > 1 and more than one sheet to slice, sheets go to worker
+    processes started with "spawn" on every platform. Spawned workers
+    re-import the caller's main module, so a script calling this must do
+    so under an `if __name__ == "__main__":` guard (or pass jobs=1);
+    otherwise the pool fails with BrokenProcessPool.
+    
     Args:
         input_folder: Root folder to scan for sprite sheets
         output_folder: Output folder (default: input_folder/sliced_output)
+        jobs: Max sheets sliced in parallel (default: CPU count, 1 = serial)
+        atlas: Write imgTiles grids as atlas.png + manifest rects instead of per-tile PNGs
+        fast_intermediate: Alias for png_level=0 (sprite PNGs stored uncompressed)
+        force: Re-slice every sheet, even ones unchanged since the last run
+        png_level: zlib level for sprite PNGs (default 1 - tiny sprites barely
+            shrink at higher levels but take several times longer to encode);
+            a nonzero level can't be combined with fast_intermediate
+        dedupe: Write pixel-identical sprites once per sheet (repeats get "dup_of")
     """
+    if fast_intermediate:
+        if png_level not in (None, 0):
+            raise ValueError(f"fast_intermediate means png_level=0, got png_level={png_level}")
+        png_level = 0
+    elif png_level is None:
+        png_level = 1
+    
     input_folder = Path(input_folder)
     
     if output_folder is None:
@@ -573,62 +913,76 @@ def batch_auto_slice(input_folder, output_folder=None):
     for s in sheets:
         print(f"  - {s['path'].relative_to(input_folder)} ({s['type']})")
     
-    # Group by source folder for organized output
-    results = []
+    slice_opts = {
+        "atlas": atlas,
+        "compress_level": png_level,
+        "dedupe": dedupe,
+    }
     
-    for sheet in sheets:
-        img = Image.open(sheet["path"])
-        width, height = img.size
-        
-        # Detect scale and calculate tile size
-        if sheet["type"] == "tiles":
-            scale_name, scale_mult = detect_scale(width, BASE_TILES["width"])
-            tile_size = (BASE_TILES["width"] // BASE_TILES["grid_cols"]) * scale_mult
-            base_ref = f"{BASE_TILES['grid_cols']} cols"
-        else:  # ships/tuna
-            scale_name, scale_mult = detect_scale(width, BASE_TUNA["width"])
-            tile_size = (BASE_TUNA["width"] // BASE_TUNA["grid_cols"]) * scale_mult
-            base_ref = f"{BASE_TUNA['grid_cols']} cols"
-        
-        # Generate output folder name
-        folder_name = get_output_folder_name(sheet)
-        out_subdir = f"{sheet['type']}_{scale_name}"
-        out_path = output_folder / folder_name / out_subdir
+    # Skip sheets unchanged (mtime + size + source + options) since the last run,
+    # as long as their output is still there
+    scan_cache = {} if force else load_scan_cache(output_folder)
+    new_cache = {}
+    results = [None] * len(sheets)
+    todo = []
+    sizes = []
+    keys = []
+    
+    for i, sheet in enumerate(sheets):
+        st = sheet["path"].stat()
+        sizes.append(st.st_size)
+        # Not resolve(): a sheet linked into two folders is two sheets here
+        key = os.path.abspath(sheet["path"])
+        keys.append(key)
+        # The relative source decides the output folder name (and the
+        # manifest's "source"), so slicing from another root is a change
+        source = sheet["path"].relative_to(input_folder).as_posix()
+        stamp = [st.st_mtime_ns, st.st_size, source, slice_opts]
+        new_cache[key] = {"stamp": stamp}
         
-        print(f"\n{'─' * 70}")
-        print(f"Processing: {sheet['path'].name}")
-        print(f"  Source:     {sheet['path'].relative_to(input_folder)}")
-        print(f"  Dimensions: {width}x{height}")
-        print(f"  Detected:   {scale_name} scale ({base_ref} → {tile_size}x{tile_size}px)")
-        print(f"  Output:     {out_path.relative_to(output_folder)}")
-        
-        # Use different slicing method for imgTuna vs imgTiles
-        if sheet["type"] == "ships":
-            # imgTuna has non-uniform sprite regions - use special slicer
-            saved, empty = slice_tuna_image(
-                sheet["path"],
-                scale_mult,
-                out_path
-            )
+        cached = scan_cache.get(key)
+        if (cached and cached.get("stamp") == stamp
+                and (output_folder / cached["result"]["output"] / "manifest.json").exists()):
+            results[i] = cached["result"]
+            print(f"\nUnchanged, skipping: {cached['result']['source']}")
         else:
-            # imgTiles is a uniform grid
-            saved, empty = slice_image(
-                sheet["path"],
-                tile_size,
-                out_path,
-                sheet["type"]
-            )
-        
-        print(f"  Result:     {saved} saved, {empty} empty")
-        
-        results.append({
-            "source": str(sheet["path"].relative_to(input_folder)),
-            "output": str(out_path.relative_to(output_folder)),
-            "scale": scale_name,
-            "tile_size": tile_size,
-            "saved": saved,
-            "empty": empty
-        })
+            todo.append(i)
+    
+    prefetch_sheets([sheets[i] for i in todo])
+    
+    # Slice sheets in parallel - each sheet is an independent decode/crop/encode job
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(todo)))
+    
+    if jobs == 1:
+        for i in todo:
+            results[i], log = _slice_one_sheet(sheets[i], input_folder, output_folder, **slice_opts)
+            print(log)
+    else:
+        # Biggest sheets first so a large 4x sheet doesn't start last and
+        # leave the other workers idle at the end
+        todo.sort(key=lambda i: -sizes[i])
+        # Split the cores between the sheet processes so their PNG save pools
+        # don't add up to cpu_count() threads each
+        workers = max(1, (os.cpu_count() or 1) // jobs)
+        # Always spawn (the Windows default): forking the multi-threaded GUI
+        # would hand children its LogRedirector stdout and possibly a held
+        # log_queue lock, deadlocking their first write
+        with ProcessPoolExecutor(max_workers=jobs,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {
+                pool.submit(_slice_one_sheet, sheets[i], input_folder, output_folder,
+                            workers=workers, **slice_opts): i
+                for i in todo
+            }
+            for future in as_completed(futures):
+                results[futures[future]], log = future.result()
+                print(log)
+    
+    for key, result in zip(keys, results):
+        new_cache[key]["result"] = result
+    save_scan_cache(output_folder, new_cache)
     
     # Summary
     print("\n" + "=" * 70)
@@ -664,8 +1018,7 @@ def batch_auto_slice(input_folder, output_folder=None):
         "results": results
     }
     
-    with open(output_folder / "batch_manifest.json", 'w') as f:
-        json.dump(batch_manifest, f, indent=2)
+    write_json(output_folder / "batch_manifest.json", batch_manifest)
     
     print(f"\nBatch manifest saved to: {output_folder}/batch_manifest.json")
 
@@ -696,14 +1049,31 @@ Output structure:
     parser.add_argument("input_folder", help="Root folder containing sprite sheets")
     parser.add_argument("output_folder", nargs="?", default=None,
                         help="Output folder (default: input_folder/sliced_output)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Max sheets to slice in parallel (default: CPU count)")
+    parser.add_argument("--atlas", action="store_true",
+                        help="Keep tile grids as one atlas.png + manifest rects (no per-tile PNGs)")
+    parser.add_argument("--fast-intermediate", action="store_true",
+                        help="Alias for --png-level 0 (uncompressed sprite PNGs)")
+    parser.add_argument("--png-level", type=int, default=None, choices=range(10), metavar="0-9",
+                        help="zlib level for sprite PNGs (default: 1, 9 = smallest files)")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Write pixel-identical sprites once; repeats reference the first file")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-slice all sheets, even ones unchanged since the last run")
     
     args = parser.parse_args()
     
+    if args.fast_intermediate and args.png_level not in (None, 0):
+        parser.error(f"--fast-intermediate (= --png-level 0) conflicts with --png-level {args.png_level}")
+    
     if not Path(args.input_folder).exists():
         print(f"ERROR: Input folder not found: {args.input_folder}")
         sys.exit(1)
     
-    batch_auto_slice(args.input_folder, args.output_folder)
+    batch_auto_slice(args.input_folder, args.output_folder, jobs=args.jobs, atlas=args.atlas,
+                     fast_intermediate=args.fast_intermediate, force=args.force,
+                     png_level=args.png_level, dedupe=args.dedupe)
 
 
 if __name__ == "__main__":
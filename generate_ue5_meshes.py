@@ -13,7 +13,7 @@ Example:
 
 Requirements:
     - manifest.json with height_uu (run tile_categorizer.py first)
-    - No external dependencies (pure Python)
+    - No external dependencies (pure Python); Pillow only for --atlas slices
 
 UE5 Import Notes:
     1. Import OBJ files via Content Browser
@@ -28,6 +28,9 @@ import sys
 import json
 import shutil
 import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -49,19 +52,46 @@ SCALE_CONFIGS = {
 }
 
 
-def generate_box_obj(width, height, depth, name, texture_file):
+# Normals and faces are identical for every box
+_BOX_NORMALS = "\n".join([
+    "vn 0 0 -1",  # 1: down
+    "vn 0 0 1",   # 2: up
+    "vn 0 -1 0",  # 3: front
+    "vn 0 1 0",   # 4: back
+    "vn -1 0 0",  # 5: left
+    "vn 1 0 0",   # 6: right
+]) + "\n\n"
+
+# Faces: v/vt/vn
+_BOX_FACES = "\n".join([
+    "f 8/4/2 7/3/2 6/2/2 5/1/2",  # Top (looking down at it)
+    "f 1/1/1 2/2/1 3/3/1 4/4/1",  # Bottom
+    "f 1/5/3 5/8/3 6/7/3 2/6/3",  # Front
+    "f 3/5/4 7/8/4 8/7/4 4/6/4",  # Back
+    "f 4/5/5 8/8/5 5/7/5 1/6/5",  # Left
+    "f 2/5/6 6/8/6 7/7/6 3/6/6",  # Right
+]) + "\n"
+
+_MTL_TEMPLATE = (
+    "# Material for {name}\n"
+    "newmtl {name}_mat\n"
+    "Ka 1.0 1.0 1.0\n"    # Ambient
+    "Kd 1.0 1.0 1.0\n"    # Diffuse
+    "Ks 0.0 0.0 0.0\n"    # Specular (none for pixel art)
+    "d 1.0\n"              # Opacity
+    "illum 2\n"            # Illumination model
+    "map_Kd {texture_file}\n"
+)
+
+
+@lru_cache(maxsize=None, typed=True)
+def _box_geometry(width, height, depth):
     """
-    Generate OBJ content for an extruded box with proper UV mapping.
+    Vertex + UV + normal block of a box OBJ.
     
-    Args:
-        width: Box width in Unreal Units
-        height: Box height (Y dimension) in Unreal Units  
-        depth: Box extrusion depth (Z dimension) in Unreal Units
-        name: Mesh name
-        texture_file: Relative path to texture
-    
-    Returns:
-        Tuple of (obj_content, mtl_content)
+    Only a handful of sizes occur (one tile size, one height per category),
+    so each block is built once and shared by every mesh of that size.
+    typed=True keeps 5 and 5.0 apart since they print differently.
     """
     w, h, d = width / 2, height / 2, depth
     
@@ -84,47 +114,94 @@ def generate_box_obj(width, height, depth, name, texture_file):
         f"vt 0 0", f"vt 1 0", f"vt 1 {side_v}", f"vt 0 {side_v}",  # Sides (tiled)
     ]
     
-    # Normals
-    normals = [
-        "vn 0 0 -1",  # 1: down
-        "vn 0 0 1",   # 2: up
-        "vn 0 -1 0",  # 3: front
-        "vn 0 1 0",   # 4: back
-        "vn -1 0 0",  # 5: left
-        "vn 1 0 0",   # 6: right
-    ]
+    return "\n".join(vertices) + "\n\n" + "\n".join(uvs) + "\n\n" + _BOX_NORMALS
+
+
+def generate_box_obj(width, height, depth, name, texture_file):
+    """
+    Generate OBJ content for an extruded box with proper UV mapping.
     
-    # Faces: v/vt/vn
-    faces = [
-        "f 8/4/2 7/3/2 6/2/2 5/1/2",  # Top (looking down at it)
-        "f 1/1/1 2/2/1 3/3/1 4/4/1",  # Bottom
-        "f 1/5/3 5/8/3 6/7/3 2/6/3",  # Front
-        "f 3/5/4 7/8/4 8/7/4 4/6/4",  # Back
-        "f 4/5/5 8/8/5 5/7/5 1/6/5",  # Left
-        "f 2/5/6 6/8/6 7/7/6 3/6/6",  # Right
-    ]
+    Args:
+        width: Box width in Unreal Units
+        height: Box height (Y dimension) in Unreal Units  
+        depth: Box extrusion depth (Z dimension) in Unreal Units
+        name: Mesh name
+        texture_file: Relative path to texture
     
-    obj = f"# {name}\n"
-    obj += f"mtllib {name}.mtl\n"
-    obj += f"o {name}\n\n"
-    obj += "\n".join(vertices) + "\n\n"
-    obj += "\n".join(uvs) + "\n\n"
-    obj += "\n".join(normals) + "\n\n"
-    obj += f"usemtl {name}_mat\n"
-    obj += "\n".join(faces) + "\n"
-    
-    mtl = f"# Material for {name}\n"
-    mtl += f"newmtl {name}_mat\n"
-    mtl += "Ka 1.0 1.0 1.0\n"    # Ambient
-    mtl += "Kd 1.0 1.0 1.0\n"    # Diffuse
-    mtl += "Ks 0.0 0.0 0.0\n"    # Specular (none for pixel art)
-    mtl += "d 1.0\n"              # Opacity
-    mtl += "illum 2\n"            # Illumination model
-    mtl += f"map_Kd {texture_file}\n"
+    Returns:
+        Tuple of (obj_content, mtl_content)
+    """
+    obj = (
+        f"# {name}\nmtllib {name}.mtl\no {name}\n\n"
+        f"{_box_geometry(width, height, depth)}"
+        f"usemtl {name}_mat\n{_BOX_FACES}"
+    )
+    mtl = _MTL_TEMPLATE.format(name=name, texture_file=texture_file)
     
     return obj, mtl
 
 
+# Mesh output is thousands of tiny independent files: texture links/crops and
+# .obj/.mtl writes run on a thread pool
+MESH_WRITE_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+MESH_MAX_PENDING = MESH_WRITE_WORKERS * 4
+
+
+def submit_bounded(pool, pending, limit, fn, *args):
+    """
+    Submit fn(*args) to pool and track its future in the pending deque.
+    
+    With limit jobs already in flight it first waits on the oldest, so the
+    queued work (and the images it holds) stays bounded.
+    """
+    if len(pending) >= limit:
+        pending.popleft().result()
+    pending.append(pool.submit(fn, *args))
+
+
+def drain(pending):
+    """Wait for every pending future, re-raising the first job error."""
+    for future in pending:
+        future.result()
+
+
+def write_mesh_files(out_prefix, name, obj, mtl):
+    """Write a mesh's .obj and .mtl files (out_prefix: output dir ending in a separator)."""
+    with open(out_prefix + name + ".obj", 'w') as f:
+        f.write(obj)
+    with open(out_prefix + name + ".mtl", 'w') as f:
+        f.write(mtl)
+
+
+def link_or_copy(src, dst):
+    """
+    Put src's texture at dst as a hard link when possible, else copy it.
+    
+    A hard link moves no data at all; copyfile (sendfile / CopyFileEx fast
+    paths) covers other drives and filesystems without link support.
+    Sharing the inode is safe because the slicers and save_texture always
+    write a temp file and os.replace() it: that breaks the link instead of
+    rewriting an already generated mesh's texture in place.
+    """
+    try:
+        if os.path.samefile(src, dst):
+            return  # Already linked by an earlier run (or a deduped sprite)
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def save_texture(img, dst):
+    """Save an atlas-cut texture as a PNG at dst (temp file + os.replace)."""
+    tmp_path = dst + ".tmp"
+    img.save(tmp_path, "PNG")
+    os.replace(tmp_path, dst)
+
+
 def process_tiles(tiles_dir, output_dir, tile_size_uu=100):
     """
     Generate meshes for all tiles using heights from manifest.
@@ -152,30 +229,53 @@ def process_tiles(tiles_dir, output_dir, tile_size_uu=100):
     textures_dir = output_dir / "textures"
     textures_dir.mkdir(exist_ok=True)
     
+    src_prefix = os.path.join(tiles_dir, "")
+    out_prefix = os.path.join(output_dir, "")
+    tex_prefix = os.path.join(textures_dir, "")
+    
+    # Atlas slices have no per-tile PNGs - cut each texture from the atlas
+    atlas = None
+    if "atlas" in manifest:
+        from PIL import Image
+        atlas = Image.open(tiles_dir / manifest["atlas"]).convert("RGBA")
+    
     count = 0
-    for tile_name, tile_info in manifest["tiles"].items():
-        texture_file = tile_info["file"]
-        height = tile_info.get("height_uu", 5)  # Default 5 UU if not categorized
+    placed = set()  # Texture files already queued (deduped tiles share one)
+    with ThreadPoolExecutor(max_workers=MESH_WRITE_WORKERS) as pool:
+        pending = deque()
         
-        src = tiles_dir / texture_file
-        if not src.exists():
-            continue
+        for tile_name, tile_info in manifest["tiles"].items():
+            texture_file = tile_info["file"]
+            height = tile_info.get("height_uu", 5)  # Default 5 UU if not categorized
+            
+            if atlas is not None:
+                if texture_file not in placed:
+                    x, y, w, h = tile_info["rect"]
+                    texture = atlas.crop((x, y, x + w, y + h))
+                    submit_bounded(pool, pending, MESH_MAX_PENDING,
+                                   save_texture, texture, tex_prefix + texture_file)
+            else:
+                src = src_prefix + texture_file
+                if not os.path.exists(src):
+                    continue
+                
+                # Copy texture
+                if texture_file not in placed:
+                    submit_bounded(pool, pending, MESH_MAX_PENDING,
+                                   link_or_copy, src, tex_prefix + texture_file)
+            placed.add(texture_file)
+            
+            # Generate mesh
+            obj, mtl = generate_box_obj(
+                tile_size_uu, tile_size_uu, height,
+                tile_name, f"textures/{texture_file}"
+            )
+            submit_bounded(pool, pending, MESH_MAX_PENDING,
+                           write_mesh_files, out_prefix, tile_name, obj, mtl)
+            
+            count += 1
         
-        # Copy texture
-        shutil.copy(src, textures_dir / texture_file)
-        
-        # Generate mesh
-        obj, mtl = generate_box_obj(
-            tile_size_uu, tile_size_uu, height,
-            tile_name, f"textures/{texture_file}"
-        )
-        
-        with open(output_dir / f"{tile_name}.obj", 'w') as f:
-            f.write(obj)
-        with open(output_dir / f"{tile_name}.mtl", 'w') as f:
-            f.write(mtl)
-        
-        count += 1
+        drain(pending)
     
     return count
 
@@ -207,29 +307,39 @@ def process_ships(ships_dir, output_dir, ship_size_uu=200):
     textures_dir = output_dir / "textures"
     textures_dir.mkdir(exist_ok=True)
     
+    src_prefix = os.path.join(ships_dir, "")
+    out_prefix = os.path.join(output_dir, "")
+    tex_prefix = os.path.join(textures_dir, "")
+    
     count = 0
-    for ship_name, ship_info in manifest["tiles"].items():
-        texture_file = ship_info["file"]
-        
-        src = ships_dir / texture_file
-        if not src.exists():
-            continue
-        
-        # Copy texture
-        shutil.copy(src, textures_dir / texture_file)
-        
-        # Ships are flat planes (1 UU height)
-        obj, mtl = generate_box_obj(
-            ship_size_uu, ship_size_uu, 1,
-            ship_name, f"textures/{texture_file}"
-        )
+    placed = set()  # Texture files already queued (deduped sprites share one)
+    with ThreadPoolExecutor(max_workers=MESH_WRITE_WORKERS) as pool:
+        pending = deque()
         
-        with open(output_dir / f"{ship_name}.obj", 'w') as f:
-            f.write(obj)
-        with open(output_dir / f"{ship_name}.mtl", 'w') as f:
-            f.write(mtl)
+        for ship_name, ship_info in manifest["tiles"].items():
+            texture_file = ship_info["file"]
+            
+            src = src_prefix + texture_file
+            if not os.path.exists(src):
+                continue
+            
+            # Copy texture
+            if texture_file not in placed:
+                placed.add(texture_file)
+                submit_bounded(pool, pending, MESH_MAX_PENDING,
+                               link_or_copy, src, tex_prefix + texture_file)
+            
+            # Ships are flat planes (1 UU height)
+            obj, mtl = generate_box_obj(
+                ship_size_uu, ship_size_uu, 1,
+                ship_name, f"textures/{texture_file}"
+            )
+            submit_bounded(pool, pending, MESH_MAX_PENDING,
+                           write_mesh_files, out_prefix, ship_name, obj, mtl)
+            
+            count += 1
         
-        count += 1
+        drain(pending)
     
     return count
 
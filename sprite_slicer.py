@@ -18,28 +18,24 @@ import os
 import sys
 import json
 import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from PIL import Image
 
+from batch_auto_slicer import drain, save_rgba_png, submit_bounded
 
-def is_empty_tile(img, threshold=5):
-    """
-    Check if tile is fully transparent or near-empty.
-    
-    Args:
-        img: PIL Image in RGBA mode
-        threshold: Minimum visible pixels to be considered non-empty
-    
-    Returns:
-        True if tile is empty/near-empty
-    """
-    data = list(img.getdata())
-    # Count pixels with alpha > 10
-    visible = sum(1 for p in data if len(p) > 3 and p[3] > 10)
-    return visible < threshold
+
+# Tiles with fewer visible (alpha > 10) pixels than this are skipped as empty
+MIN_VISIBLE_PIXELS = 5
 
 
-def slice_spritesheet(input_path, tile_size, output_dir, sprite_type="tiles"):
+def count_visible(alpha):
+    """Count pixels with alpha > 10 in an "L" alpha plane (C-level histogram)."""
+    return sum(alpha.histogram()[11:])
+
+
+def slice_spritesheet(input_path, tile_size, output_dir, sprite_type="tiles", compress_level=1):
     """
     Slice a sprite sheet into individual tiles.
     
@@ -48,6 +44,8 @@ def slice_spritesheet(input_path, tile_size, output_dir, sprite_type="tiles"):
         tile_size: Size of each tile (assumes square tiles)
         output_dir: Directory to save sliced tiles
         sprite_type: Type prefix for naming ('tiles' or 'ships')
+        compress_level: zlib level for tile PNGs (default 1 - small tiles
+            barely shrink at higher levels but encode several times slower)
     
     Returns:
         Tuple of (saved_count, empty_count)
@@ -84,58 +82,86 @@ def slice_spritesheet(input_path, tile_size, output_dir, sprite_type="tiles"):
     empty = 0
     manifest = {}
     
-    for row in range(rows):
-        for col in range(cols):
-            x = col * tile_size
+    # Test emptiness on the alpha plane (extracted once) through one reused
+    # tile-sized buffer, so only tiles that get saved pay for an RGBA crop
+    alpha = img.getchannel("A")
+    alpha_buf = Image.new("L", (tile_size, tile_size))
+    
+    out_prefix = os.path.join(output_dir, "")
+    
+    # PNG saves run on a thread pool so they overlap with probing/cropping.
+    # In-flight saves are capped so queued tile copies stay small.
+    workers = os.cpu_count() or 1
+    max_pending = workers * 4
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        
+        for row in range(rows):
             y = row * tile_size
             
-            tile = img.crop((x, y, x + tile_size, y + tile_size))
-            
-            if is_empty_tile(tile):
-                empty += 1
+            # A tile can't have more visible pixels than its row band, so a
+            # near-empty band settles every tile in the row with one histogram
+            alpha_band = alpha.crop((0, y, width, y + tile_size))
+            if count_visible(alpha_band) < MIN_VISIBLE_PIXELS:
+                empty += cols
                 continue
             
-            tile_idx = row * cols + col
-            tile_name = f"{sprite_type}_{tile_idx:04d}"
-            tile_path = output_dir / f"{tile_name}.png"
-            
-            tile.save(tile_path, "PNG")
-            
-            manifest[tile_name] = {
-                "file": f"{tile_name}.png",
-                "row": row,
-                "col": col,
-                "index": tile_idx
-            }
-            saved += 1
+            for col in range(cols):
+                x = col * tile_size
+                
+                alpha_buf.paste(alpha_band, (-x, 0))
+                if count_visible(alpha_buf) < MIN_VISIBLE_PIXELS:
+                    empty += 1
+                    continue
+                
+                tile = img.crop((x, y, x + tile_size, y + tile_size))
+                
+                tile_idx = row * cols + col
+                tile_name = f"{sprite_type}_{tile_idx:04d}"
+                tile_path = out_prefix + tile_name + ".png"
+                
+                submit_bounded(pool, pending, max_pending,
+                               save_rgba_png, tile, tile_path, compress_level)
+                
+                manifest[tile_name] = {
+                    "file": f"{tile_name}.png",
+                    "row": row,
+                    "col": col,
+                    "index": tile_idx
+                }
+                saved += 1
+        
+        drain(pending)
     
     print(f"\nSaved: {saved} tiles")
     print(f"Empty (skipped): {empty} tiles")
     
     # Save manifest
     manifest_path = output_dir / "manifest.json"
+    # One dumps + write: json.dump() would issue a write per encoder chunk
     with open(manifest_path, 'w') as f:
-        json.dump({
+        f.write(json.dumps({
             "source": input_path.name,
             "tile_size": tile_size,
             "grid_cols": cols,
             "grid_rows": rows,
             "total_tiles": saved,
             "tiles": manifest
-        }, f, indent=2)
+        }, indent=2))
     
     print(f"Manifest saved: {manifest_path}")
     
     return saved, empty
 
 
-def batch_slice(config):
+def batch_slice(config, compress_level=1):
     """
     Batch slice multiple sprite sheets from a config dict.
     
     Args:
         config: Dict mapping output names to slice configurations
                 Each config has: path, tile_size, output_dir, type
+        compress_level: zlib level for tile PNGs
     """
     print("\n" + "="*60)
     print("BATCH SPRITE SHEET SLICER")
@@ -147,7 +173,8 @@ def batch_slice(config):
             input_path=cfg["path"],
             tile_size=cfg["tile_size"],
             output_dir=cfg["output_dir"],
-            sprite_type=cfg.get("type", "tiles")
+            sprite_type=cfg.get("type", "tiles"),
+            compress_level=compress_level
         )
         results[name] = {"saved": saved, "empty": empty}
     
@@ -202,15 +229,18 @@ def main():
                         help="Sprite type for naming (default: tiles)")
     parser.add_argument("--batch", action="store_true",
                         help="Run batch mode with AC_GAME_CONFIG")
+    parser.add_argument("--png-level", type=int, default=1, choices=range(10), metavar="0-9",
+                        help="zlib level for tile PNGs (default: 1, 9 = smallest files)")
     
     args = parser.parse_args()
     
     if args.batch:
         # Run batch mode with built-in config
         # Modify AC_GAME_CONFIG paths as needed
-        batch_slice(AC_GAME_CONFIG)
+        batch_slice(AC_GAME_CONFIG, compress_level=args.png_level)
     elif args.input and args.tile_size and args.output_dir:
-        slice_spritesheet(args.input, args.tile_size, args.output_dir, args.type)
+        slice_spritesheet(args.input, args.tile_size, args.output_dir, args.type,
+                          compress_level=args.png_level)
     else:
         parser.print_help()
         print("\n" + "="*60)
@@ -18,8 +18,10 @@ import os
 import sys
 import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from operator import mul
 from pathlib import Path
-from PIL import Image
+from PIL import Image, ImageChops
 
 
 # ============================================================================
@@ -42,6 +44,36 @@ CATEGORY_HEIGHTS = {
 }
 
 
+_alpha_cutoff_cache = {}
+
+
+def _visible_mask(alpha):
+    """
+    Histogram mask selecting visible pixels (alpha > 128).
+    
+    alpha - 128 (clipped at 0) is non-zero exactly where alpha > 128, and a
+    subtract is much cheaper than a point() LUT on small tiles.
+    """
+    cutoff = _alpha_cutoff_cache.get(alpha.size)
+    if cutoff is None:
+        cutoff = _alpha_cutoff_cache[alpha.size] = Image.new("L", alpha.size, 128)
+    return ImageChops.subtract(alpha, cutoff)
+
+
+def _hist_total(hist):
+    """Sum of the values behind a 256-bin histogram (sum of i * count)."""
+    return sum(map(mul, range(256), hist))
+
+
+def _hist_abs_dev(hist, mean, count, total):
+    """Sum of |value - mean| over the values behind a 256-bin histogram."""
+    split = int(mean) + 1  # Bins below split hold values <= mean
+    low_count = sum(hist[:split])
+    low_total = sum(map(mul, range(split), hist[:split]))
+    # (mean * low - low_total) + ((total - low_total) - mean * (count - low))
+    return mean * (2 * low_count - count) + (total - 2 * low_total)
+
+
 def analyze_tile(img):
     """
     Categorize a tile by its visual characteristics.
@@ -52,28 +84,36 @@ def analyze_tile(img):
     Returns:
         Tuple of (category_name, height_uu)
     """
-    data = list(img.getdata())
+    # All statistics come from histograms of the visible pixels (alpha > 128,
+    # used as the histogram mask), so the pixel data never leaves C
+    r, g, b, a = img.split()
+    count = sum(a.histogram()[129:])
     
-    # Get visible pixels only (alpha > 128)
-    visible = [(p[0], p[1], p[2]) for p in data if len(p) > 3 and p[3] > 128]
-    
-    if len(visible) < 10:
+    if count < 10:
         return "sparse", CATEGORY_HEIGHTS["sparse"]
     
+    mask = _visible_mask(a)
+    hist = img.histogram(mask)
+    hist_r, hist_g, hist_b = hist[:256], hist[256:512], hist[512:768]
+    total_r, total_g, total_b = _hist_total(hist_r), _hist_total(hist_g), _hist_total(hist_b)
+    
     # Calculate color statistics
-    avg_r = sum(p[0] for p in visible) / len(visible)
-    avg_g = sum(p[1] for p in visible) / len(visible)
-    avg_b = sum(p[2] for p in visible) / len(visible)
+    avg_r = total_r / count
+    avg_g = total_g / count
+    avg_b = total_b / count
     brightness = (avg_r + avg_g + avg_b) / 3
     
     # Color variance (texture complexity)
-    variance = sum(
-        abs(p[0] - avg_r) + abs(p[1] - avg_g) + abs(p[2] - avg_b) 
-        for p in visible
-    ) / len(visible)
+    variance = (
+        _hist_abs_dev(hist_r, avg_r, count, total_r)
+        + _hist_abs_dev(hist_g, avg_g, count, total_g)
+        + _hist_abs_dev(hist_b, avg_b, count, total_b)
+    ) / count
     
-    # Saturation (color intensity)
-    saturation = sum(max(p) - min(p) for p in visible) / len(visible)
+    # Saturation (color intensity): per-pixel max(r, g, b) - min(r, g, b)
+    high = ImageChops.lighter(ImageChops.lighter(r, g), b)
+    low = ImageChops.darker(ImageChops.darker(r, g), b)
+    saturation = _hist_total(ImageChops.subtract(high, low).histogram(mask)) / count
     
     # Color dominance checks
     red_dominant = avg_r > avg_g * 1.5 and avg_r > avg_b * 1.5
@@ -99,6 +139,39 @@ def analyze_tile(img):
         return "generic", CATEGORY_HEIGHTS["generic"]
 
 
+def open_tile(tile_prefix, tile_info, atlas=None):
+    """
+    Load a tile as RGBA, either from its own PNG or from the sheet atlas.
+    
+    Args:
+        tile_prefix: Sliced tiles directory as a string ending in a separator
+        tile_info: Manifest entry for the tile
+        atlas: Loaded atlas image when the manifest has "atlas", else None
+    
+    Returns:
+        PIL Image in RGBA mode, or None if the tile file is missing
+    """
+    if atlas is not None:
+        x, y, w, h = tile_info["rect"]
+        return atlas.crop((x, y, x + w, y + h))
+    
+    img_path = tile_prefix + tile_info["file"]
+    if not os.path.exists(img_path):
+        return None
+    
+    img = Image.open(img_path)
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    return img
+
+
+def open_atlas(tiles_dir, manifest):
+    """Load the atlas image for an atlas manifest (None for per-tile PNGs)."""
+    if "atlas" not in manifest:
+        return None
+    return Image.open(Path(tiles_dir) / manifest["atlas"]).convert("RGBA")
+
+
 def categorize_tiles(tiles_dir, create_preview=False):
     """
     Categorize all tiles in a directory and update the manifest.
@@ -132,37 +205,45 @@ def categorize_tiles(tiles_dir, create_preview=False):
     tile_count = len(manifest["tiles"])
     print(f"Analyzing {tile_count} tiles...")
     
-    for i, (tile_name, tile_info) in enumerate(manifest["tiles"].items()):
-        img_path = tiles_dir / tile_info["file"]
-        if not img_path.exists():
-            continue
-        
-        img = Image.open(img_path)
-        if img.mode != "RGBA":
-            img = img.convert("RGBA")
-        
-        category, height = analyze_tile(img)
-        
-        tile_categories[tile_name] = {
-            **tile_info,
-            "category": category,
-            "height_uu": height
-        }
-        
-        if category not in categories:
-            categories[category] = []
-        categories[category].append(tile_info["file"])
+    atlas = open_atlas(tiles_dir, manifest)
+    tile_prefix = os.path.join(tiles_dir, "")
+    
+    def load_and_analyze(tile_info):
+        img = open_tile(tile_prefix, tile_info, atlas)
+        return None if img is None else analyze_tile(img)
+    
+    # Tiles are loaded and analyzed on a thread pool; map() yields in manifest order
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+        analyzed = pool.map(load_and_analyze, manifest["tiles"].values())
         
-        # Progress indicator
-        if (i + 1) % 500 == 0:
-            print(f"  Processed {i + 1}/{tile_count}...")
+        tiles = zip(manifest["tiles"].items(), analyzed)
+        for i, ((tile_name, tile_info), result) in enumerate(tiles):
+            if result is None:
+                continue
+            
+            category, height = result
+            
+            tile_categories[tile_name] = {
+                **tile_info,
+                "category": category,
+                "height_uu": height
+            }
+            
+            if category not in categories:
+                categories[category] = []
+            categories[category].append(tile_info["file"])
+            
+            # Progress indicator
+            if (i + 1) % 500 == 0:
+                print(f"  Processed {i + 1}/{tile_count}...")
     
     # Update manifest
     manifest["tiles"] = tile_categories
     manifest["categories"] = {cat: len(files) for cat, files in categories.items()}
     
+    # One dumps + write: json.dump() would issue a write per encoder chunk
     with open(manifest_path, 'w') as f:
-        json.dump(manifest, f, indent=2)
+        f.write(json.dumps(manifest, indent=2))
     
     print(f"\nCategories:")
     for cat, count in sorted(manifest["categories"].items(), key=lambda x: -x[1]):
@@ -173,12 +254,12 @@ def categorize_tiles(tiles_dir, create_preview=False):
     
     # Create preview sheets if requested
     if create_preview:
-        create_category_previews(tiles_dir, manifest, categories)
+        create_category_previews(tiles_dir, manifest, categories, atlas)
     
     return manifest["categories"]
 
 
-def create_category_previews(tiles_dir, manifest, categories):
+def create_category_previews(tiles_dir, manifest, categories, atlas=None):
     """
     Create preview sheets for each category (10x10 grid, first 100 tiles).
     """
@@ -190,6 +271,8 @@ def create_category_previews(tiles_dir, manifest, categories):
     scale = max(1, 64 // tile_size)  # Scale up small tiles for visibility
     
     dir_name = tiles_dir.name
+    tile_prefix = os.path.join(tiles_dir, "")
+    tiles_by_file = {info["file"]: info for info in manifest["tiles"].values()}
     
     print(f"\nCreating preview sheets...")
     
@@ -201,26 +284,31 @@ def create_category_previews(tiles_dir, manifest, categories):
         cols = 10
         rows = (len(files) + cols - 1) // cols
         
-        # Dark gray background
+        # Dark gray background. Tiles are composited at native size and the
+        # whole sheet is scaled once - nearest-neighbour upscaling commutes
+        # with the per-pixel alpha paste, so this matches scaling each tile.
         sheet = Image.new('RGBA', 
-            (cols * tile_size * scale, rows * tile_size * scale), 
+            (cols * tile_size, rows * tile_size), 
             (40, 40, 40, 255)
         )
         
         for i, fname in enumerate(files):
             try:
-                tile = Image.open(tiles_dir / fname)
-                if scale > 1:
-                    tile = tile.resize(
-                        (tile_size * scale, tile_size * scale), 
-                        Image.NEAREST
-                    )
-                x = (i % cols) * tile_size * scale
-                y = (i // cols) * tile_size * scale
+                tile = open_tile(tile_prefix, tiles_by_file[fname], atlas)
+                if tile.size != (tile_size, tile_size):
+                    tile = tile.resize((tile_size, tile_size), Image.NEAREST)
+                x = (i % cols) * tile_size
+                y = (i // cols) * tile_size
                 sheet.paste(tile, (x, y), tile)
             except Exception as e:
                 pass
         
+        if scale > 1:
+            sheet = sheet.resize(
+                (cols * tile_size * scale, rows * tile_size * scale), 
+                Image.NEAREST
+            )
+        
         preview_path = previews_dir / f"{dir_name}_{cat}.png"
         sheet.save(preview_path)
         print(f"  Created: {preview_path.name}")